@@ -2,8 +2,11 @@ import random
 import numpy as np
 from typing import List, Dict
 from cvrp import CVRP
+from kernels import split_to_routes
 
 class GeneticAlgorithm:
+    ROUTE_CACHE_SIZE = 100000  # Max memoized routes before the cache is reset
+
     def __init__(self, cvrp: CVRP, pop_size: int = 100, generations: int = 500,
                  mutation_rate: float = 0.1, crossover_rate: float = 0.8,
                  tournament_size: int = 5, elitism: float = 0.1):
@@ -14,55 +17,51 @@ class GeneticAlgorithm:
         self.crossover_rate = crossover_rate
         self.tournament_size = tournament_size
         self.elitism = int(elitism * pop_size)
+        self._route_cache = {}  # route tuple -> route distance
         self.population = self._initialize_population()
+        # Fitness of each individual, kept index-aligned with self.population
+        self.fitness = np.array([self._calculate_fitness(ind) for ind in self.population])
         
     def _initialize_population(self) -> List[List[List[int]]]:
-        population = []
-        while len(population) < self.pop_size:
-            solution = self._generate_random_solution()
-            if self.cvrp.validate_solution(solution):
-                population.append(solution)
-        return population
+        # _split_to_routes only builds feasible routes covering every
+        # customer once, so individuals need no validation
+        return [self._generate_random_solution() for _ in range(self.pop_size)]
     
     def _generate_random_solution(self) -> List[List[int]]:
         customers = list(range(1, len(self.cvrp.locations)))
         random.shuffle(customers)
-        routes = []
-        current_route = [0]
-        current_load = 0
-        
-        for customer in customers:
-            demand = self.cvrp.demands[customer]
-            if current_load + demand > self.cvrp.vehicle_capacity:
-                current_route.append(0)
-                routes.append(current_route)
-                current_route = [0, customer]
-                current_load = demand
-            else:
-                current_route.append(customer)
-                current_load += demand
-        
-        if len(current_route) > 1:
-            current_route.append(0)
-            routes.append(current_route)
-        return routes
+        return self._split_to_routes(customers)
     
     def _calculate_fitness(self, solution: List[List[int]]) -> float:
-        return sum(self.cvrp.calculate_route_distance(route) for route in solution)
+        return sum(self._route_distance(route) for route in solution)
+    
+    def _route_distance(self, route: List[int]) -> float:
+        # Crossover and mutation keep many routes intact, so most lookups hit
+        key = tuple(route)
+        distance = self._route_cache.get(key)
+        if distance is None:
+            if len(self._route_cache) >= self.ROUTE_CACHE_SIZE:
+                self._route_cache.clear()
+            distance = self.cvrp.calculate_route_distance(route)
+            self._route_cache[key] = distance
+        return distance
     
     def _tournament_selection(self) -> List[List[int]]:
-        tournament = random.sample(self.population, self.tournament_size)
-        return min(tournament, key=lambda x: self._calculate_fitness(x))
+        idx = np.array(random.sample(range(len(self.population)), self.tournament_size))
+        return self.population[idx[np.argmin(self.fitness[idx])]]
     
     def _ordered_crossover(self, parent1: List[List[int]], parent2: List[List[int]]) -> List[List[int]]:
-        flat1 = [node for route in parent1 for node in route if node != 0][:-1]
-        flat2 = [node for route in parent2 for node in route if node != 0][:-1]
+        flat1 = [node for route in parent1 for node in route if node != 0]
+        flat2 = [node for route in parent2 for node in route if node != 0]
         
         size = len(flat1)
         start, end = sorted(random.sample(range(size), 2))
         child = [-1] * size
         
         child[start:end] = flat1[start:end]
+        # Customers already copied from parent1, for O(1) membership checks
+        inserted = np.zeros(len(self.cvrp.locations), dtype=np.bool_)
+        inserted[flat1[start:end]] = True
         
         ptr = 0
         for i in range(size):
@@ -70,33 +69,15 @@ class GeneticAlgorithm:
                 ptr = end
             if ptr >= size:
                 break
-            if flat2[i] not in child[start:end]:
+            if not inserted[flat2[i]]:
                 child[ptr] = flat2[i]
                 ptr += 1
                 
         return self._split_to_routes(child)
     
     def _split_to_routes(self, customers: List[int]) -> List[List[int]]:
-        routes = []
-        current_route = [0]
-        current_load = 0
-        
-        for customer in customers:
-            demand = self.cvrp.demands[customer]
-            if current_load + demand > self.cvrp.vehicle_capacity:
-                current_route.append(0)
-                routes.append(current_route)
-                current_route = [0, customer]
-                current_load = demand
-            else:
-                current_route.append(customer)
-                current_load += demand
-        
-        if len(current_route) > 1:
-            current_route.append(0)
-            routes.append(current_route)
-        return routes
-    
+        return split_to_routes(customers, self.cvrp.demands, self.cvrp.vehicle_capacity)
+
     def _mutate(self, solution: List[List[int]]) -> List[List[int]]:
         if random.random() < self.mutation_rate:
             flat = [node for route in solution for node in route if node != 0]
@@ -107,22 +88,21 @@ class GeneticAlgorithm:
     
     def run(self) -> Dict[str, any]:
         stats = {
-            'best': [],
-            'avg': [],
-            'worst': []
+            'best': np.empty(self.generations),
+            'avg': np.empty(self.generations),
+            'worst': np.empty(self.generations)
         }
         
         for gen in range(self.generations):
-            # Evaluate population
-            fitness = [self._calculate_fitness(ind) for ind in self.population]
-            
             # Record stats
-            stats['best'].append(min(fitness))
-            stats['avg'].append(np.mean(fitness))
-            stats['worst'].append(max(fitness))
+            stats['best'][gen] = self.fitness.min()
+            stats['avg'][gen] = self.fitness.mean()
+            stats['worst'][gen] = self.fitness.max()
             
             # Sort population
-            self.population.sort(key=lambda x: self._calculate_fitness(x))
+            order = np.argsort(self.fitness, kind='stable')
+            self.population = [self.population[i] for i in order]
+            self.fitness = self.fitness[order]
             
             # Keep elites
             new_pop = self.population[:self.elitism]
@@ -138,19 +118,21 @@ class GeneticAlgorithm:
                     child = [route.copy() for route in parent1]
                 
                 child = self._mutate(child)
-                if self.cvrp.validate_solution(child):
-                    new_pop.append(child)
+                new_pop.append(child)
             
+            # Offspring are evaluated together once the generation is built
+            offspring_fit = [self._calculate_fitness(child) for child in new_pop[self.elitism:]]
             self.population = new_pop
+            self.fitness = np.concatenate((self.fitness[:self.elitism], offspring_fit))
         
-        # Final evaluation
-        final_fitness = [self._calculate_fitness(ind) for ind in self.population]
+        best_solution = self.population[int(np.argmin(self.fitness))]
+        assert self.cvrp.validate_solution(best_solution)
         
         return {
-            'best_solution': min(self.population, key=lambda x: self._calculate_fitness(x)),
-            'best_distance': min(final_fitness),
-            'average_distance': np.mean(final_fitness),
-            'worst_distance': max(final_fitness),
-            'std_dev': np.std(final_fitness),
+            'best_solution': best_solution,
+            'best_distance': self.fitness.min(),
+            'average_distance': self.fitness.mean(),
+            'worst_distance': self.fitness.max(),
+            'std_dev': self.fitness.std(),
             'stats': stats  # Generational statistics
         }
\ No newline at end of file
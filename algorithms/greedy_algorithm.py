@@ -4,87 +4,54 @@ import csv
 import os
 from datetime import datetime
 from cvrp import CVRP
+from kernels import greedy_many_nb, routes_from_flat
 
 class GreedyAlgorithm:
     def __init__(self, cvrp, num_runs=10):
         self.cvrp = cvrp
         self.num_runs = num_runs  # Number of runs for statistics
         self.stats = {
-            'best': [],
-            'average': [],
-            'worst': []
+            'best': np.empty(num_runs),
+            'average': np.empty(num_runs),
+            'worst': np.empty(num_runs)
         }
 
     def run(self):
-        solutions = []
-        costs = []
+        costs, flats, flat_lens, ends, end_counts, status = self._greedy_solutions()
+        if not status.all():
+            raise ValueError("Greedy construction failed: customer demand exceeds vehicle capacity")
+        self._update_stats(costs)
         
-        for _ in range(self.num_runs):
-            solution = self._greedy_solution()
-            cost = self._calculate_cost(solution)
-            solutions.append(solution)
-            costs.append(cost)
-            self._update_stats(costs)
+        if len(costs) == 0:
+            return self._prepare_results([], [])
         
-        best_idx = np.argmin(costs)
-        return self._prepare_results(solutions[best_idx], costs)
+        best_idx = int(np.argmin(costs))
+        best_solution = routes_from_flat(
+            flats[best_idx, :flat_lens[best_idx]],
+            ends[best_idx, :end_counts[best_idx]]
+        )
+        return self._prepare_results(best_solution, costs.tolist())
 
-    def _greedy_solution(self):
-        """Generates a solution using greedy nearest neighbor approach"""
-        # Create a copy of customers to avoid modifying the original list
-        customers = list(range(1, len(self.cvrp.locations)))
-        random.shuffle(customers)  # Random starting point for variation
-        
-        routes = []
-        current_route = [0]  # Start at depot
-        current_load = 0
-        
-        while customers:
-            last_city = current_route[-1]
-            
-            # Find reachable cities sorted by distance
-            candidates = [
-                c for c in customers 
-                if self.cvrp.demands[c] + current_load <= self.cvrp.vehicle_capacity
-            ]
-            
-            if not candidates:
-                # Return to depot and start new route
-                current_route.append(0)
-                routes.append(current_route)
-                current_route = [0]
-                current_load = 0
-                continue
-                
-            # Select nearest feasible city
-            next_city = min(
-                candidates,
-                key=lambda c: self.cvrp.distance_matrix[last_city][c]
-            )
-            
-            current_route.append(next_city)
-            current_load += self.cvrp.demands[next_city]
-            customers.remove(next_city)
-        
-        # Complete final route if it has customers
-        if len(current_route) > 1:
-            current_route.append(0)
-            routes.append(current_route)
-            
-        return routes
-
-    def _calculate_cost(self, solution):
-        """Calculates total distance for a solution"""
-        if not solution:
-            return float('inf')
-        return sum(self.cvrp.calculate_route_distance(route) for route in solution)
+    def _greedy_solutions(self):
+        """Generates num_runs greedy nearest neighbor solutions in parallel"""
+        # Checked up front: errors raised inside the parallel kernel are lost
+        if self.cvrp.demands.max() > self.cvrp.vehicle_capacity:
+            raise ValueError("Customer demand exceeds vehicle capacity")
+        # Each seed drives the random scan order used for tie-breaking
+        seeds = np.array([random.getrandbits(31) for _ in range(self.num_runs)], dtype=np.int64)
+        return greedy_many_nb(
+            self.cvrp.distance_matrix,
+            self.cvrp.demands,
+            self.cvrp.vehicle_capacity,
+            seeds
+        )
 
     def _update_stats(self, costs):
-        """Updates running statistics"""
-        if costs:  # Only update if we have costs
-            self.stats['best'].append(min(costs))
-            self.stats['average'].append(np.mean(costs))
-            self.stats['worst'].append(max(costs))
+        """Records running best/average/worst after each run"""
+        np.minimum.accumulate(costs, out=self.stats['best'])
+        np.cumsum(costs, out=self.stats['average'])
+        self.stats['average'] /= np.arange(1, len(costs) + 1)
+        np.maximum.accumulate(costs, out=self.stats['worst'])
 
     def _prepare_results(self, best_solution, costs):
         """Prepares final results dictionary"""
@@ -110,7 +77,8 @@ class GreedyAlgorithm:
     @staticmethod
     def log_to_csv(results, instance_name, algorithm_name):
         """Logs """
-        filename = f"cvrp_results_{datetime.now().strftime('%Y%m%d')}.csv"
+        now = datetime.now()
+        filename = f"cvrp_results_{now.strftime('%Y%m%d')}.csv"
         file_exists = os.path.isfile(filename)
         
         with open(filename, 'a', newline='') as f:
@@ -122,7 +90,7 @@ class GreedyAlgorithm:
                 ])
                 
             writer.writerow([
-                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                now.strftime('%Y-%m-%d %H:%M:%S'),
                 instance_name,
                 algorithm_name,
                 f"{results['best_distance']:.2f}",
@@ -1,70 +1,43 @@
-import random
 import numpy as np
 import csv
 from datetime import datetime
 from cvrp import CVRP
+from kernels import random_many_nb, split_to_routes
 
 class RandomAlgorithm:
-    def __init__(self, cvrp, num_iterations=1000):
+    def __init__(self, cvrp, num_iterations=1000, seed=None):
         self.cvrp = cvrp
         self.num_iterations = num_iterations
+        self.rng = np.random.default_rng(seed)
         self.stats = {
-            'best': [],
-            'average': [],
-            'worst': []
+            'best': np.empty(num_iterations),
+            'average': np.empty(num_iterations),
+            'worst': np.empty(num_iterations)
         }
 
     def run(self):
-        best_solution = None
-        best_cost = float('inf')
-        costs = []
+        # Iterations are independent, so they are sampled and costed in parallel
+        seeds = self.rng.integers(0, 2**31, self.num_iterations)
+        costs, perms = random_many_nb(
+            self.cvrp.distance_matrix,
+            self.cvrp.demands,
+            self.cvrp.vehicle_capacity,
+            seeds
+        )
+        self._update_stats(costs)
         
-        for _ in range(self.num_iterations):
-            solution = self._random_solution()
-            cost = self._calculate_cost(solution)
-            costs.append(cost)
-            
-            if cost < best_cost:
-                best_cost = cost
-                best_solution = solution
-                
-            self._update_stats(costs)
-        
-        return self._prepare_results(best_solution, costs)
-
-    def _random_solution(self):
-        customers = list(range(1, len(self.cvrp.locations)))
-        random.shuffle(customers)
-        return self._split_to_routes(customers)
+        best_perm = perms[int(np.argmin(costs))]
+        return self._prepare_results(self._split_to_routes(best_perm), costs)
 
     def _split_to_routes(self, customers):
-        routes = []
-        current_route = [0]
-        current_load = 0
-        
-        for customer in customers:
-            demand = self.cvrp.demands[customer]
-            if current_load + demand > self.cvrp.vehicle_capacity:
-                current_route.append(0)
-                routes.append(current_route)
-                current_route = [0, customer]
-                current_load = demand
-            else:
-                current_route.append(customer)
-                current_load += demand
-        
-        if len(current_route) > 1:
-            current_route.append(0)
-            routes.append(current_route)
-        return routes
-
-    def _calculate_cost(self, solution):
-        return sum(self.cvrp.calculate_route_distance(route) for route in solution)
+        return split_to_routes(customers, self.cvrp.demands, self.cvrp.vehicle_capacity)
 
     def _update_stats(self, costs):
-        self.stats['best'].append(min(costs))
-        self.stats['average'].append(np.mean(costs))
-        self.stats['worst'].append(max(costs))
+        # Running best/average/worst after each iteration
+        np.minimum.accumulate(costs, out=self.stats['best'])
+        np.cumsum(costs, out=self.stats['average'])
+        self.stats['average'] /= np.arange(1, len(costs) + 1)
+        np.maximum.accumulate(costs, out=self.stats['worst'])
 
     def _prepare_results(self, best_solution, costs):
         return {
@@ -78,7 +51,8 @@ class RandomAlgorithm:
 
     @staticmethod
     def log_to_csv(results, instance_name, algorithm_name):
-        filename = f"results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        now = datetime.now()
+        filename = f"results_{now.strftime('%Y%m%d_%H%M%S')}.csv"
         with open(filename, 'a', newline='') as f:
             writer = csv.writer(f)
             writer.writerow([
@@ -88,5 +62,5 @@ class RandomAlgorithm:
                 results['average_distance'],
                 results['worst_distance'],
                 results['std_dev'],
-                datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                now.strftime('%Y-%m-%d %H:%M:%S')
             ])
\ No newline at end of file
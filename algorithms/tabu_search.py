@@ -1,124 +1,135 @@
-import random
+from collections import deque
 import numpy as np
 import csv
 from datetime import datetime
 from cvrp import CVRP
+from kernels import cost_of_perm, swap_costs, split_to_routes
 
 class TabuSearch:
-    def __init__(self, cvrp, iterations=500, tabu_size=50, neighborhood_size=20):
+    def __init__(self, cvrp, iterations=500, tabu_size=50, neighborhood_size=20, seed=None):
         self.cvrp = cvrp
+        self.rng = np.random.default_rng(seed)
         self.iterations = iterations
         self.tabu_size = tabu_size
         self.neighborhood_size = neighborhood_size
-        self.tabu_list = []
+        # Scratch buffer reused by every neighborhood evaluation
+        self._candidate_costs = np.empty(neighborhood_size, dtype=np.float64)
+        # Tabu moves are swapped customer pairs; the set mirrors the deque
+        # so membership checks are O(1)
+        self.tabu_deque = deque(maxlen=tabu_size)
+        self.tabu_set = set()
+        self._worst_cost = float('-inf')
         self.stats = {
-            'best': [],
-            'current': [],
-            'worst': []
+            'best': np.empty(iterations),
+            'current': np.empty(iterations),
+            'worst': np.empty(iterations)
         }
 
     def run(self):
-        current_solution = self._create_initial_solution()
-        current_cost = self._calculate_cost(current_solution)
-        best_solution = current_solution.copy()
+        # The solution is a customer permutation; routes are only built
+        # from it for the final result
+        perm = self._create_initial_solution()
+        current_cost = self._calculate_cost(perm)
+        best_perm = perm.copy()
         best_cost = current_cost
+        neighbors_i, neighbors_j = self._generate_neighbors(len(perm))
         
         for i in range(self.iterations):
-            neighbors = self._generate_neighbors(current_solution)
+            # Evaluate the whole neighborhood in one batch, then take the
+            # cheapest non-tabu swap
+            best_swap, best_move = None, None
+            swaps_i, swaps_j = neighbors_i[i], neighbors_j[i]
+            costs = self._evaluate_neighbors(perm, swaps_i, swaps_j, current_cost)
+            for k in np.argsort(costs, kind='stable'):
+                a, b = int(perm[swaps_i[k]]), int(perm[swaps_j[k]])
+                move = (min(a, b), max(a, b))
+                if move not in self.tabu_set:
+                    best_swap = (swaps_i[k], swaps_j[k])
+                    best_move = move
+                    break
             
-            # Evaluate all neighbors
-            neighbor_costs = []
-            for neighbor in neighbors:
-                cost = self._calculate_cost(neighbor)
-                neighbor_costs.append((neighbor, cost))
-            
-            # Find best non-tabu neighbor
-            best_candidate, best_candidate_cost = None, float('inf')
-            for neighbor, cost in neighbor_costs:
-                if cost < best_candidate_cost and str(neighbor) not in self.tabu_list:
-                    best_candidate = neighbor
-                    best_candidate_cost = cost
-            
-            # Update best solution if improved
-            if best_candidate_cost < best_cost:
-                best_solution = best_candidate
-                best_cost = best_candidate_cost
-            
-            # Update tabu list
-            if best_candidate:
-                self.tabu_list.append(str(best_candidate))
-                if len(self.tabu_list) > self.tabu_size:
-                    self.tabu_list.pop(0)
+            if best_swap is not None:
+                self._swap(perm, *best_swap)
+                # Recomputed rather than taken from the delta, so float
+                # round-off can't accumulate across iterations
+                current_cost = self._calculate_cost(perm)
                 
-                current_solution = best_candidate
-                current_cost = best_candidate_cost
+                # Update best solution if improved
+                if current_cost < best_cost:
+                    best_perm[:] = perm
+                    best_cost = current_cost
+                
+                # Update tabu list
+                self._make_tabu(best_move)
             
             # Update statistics
             self._update_stats(i, best_cost, current_cost)
         
-        return self._prepare_results(best_solution, best_cost)
+        return self._prepare_results(self._split_to_routes(best_perm), best_cost)
 
     def _create_initial_solution(self):
-        customers = list(range(1, len(self.cvrp.locations)))
-        random.shuffle(customers)
-        return self._split_to_routes(customers)
+        return (self.rng.permutation(len(self.cvrp.locations) - 1) + 1).astype(np.int32)
 
-    def _generate_neighbors(self, solution):
-        neighbors = []
-        for _ in range(self.neighborhood_size):
-            flat = [c for route in solution for c in route[1:-1]]
-            if len(flat) < 2:
-                continue
-                
-            i, j = random.sample(range(len(flat)), 2)
-            new_flat = flat.copy()
-            new_flat[i], new_flat[j] = new_flat[j], new_flat[i]
-            neighbor = self._split_to_routes(new_flat)
-            neighbors.append(neighbor)
-        return neighbors or [solution]
+    def _generate_neighbors(self, n):
+        """Samples the swaps of every iteration's neighborhood in one batch.
+
+        Returns two (iterations, neighborhood_size) position arrays; each
+        swap exchanges two distinct positions.
+        """
+        shape = (self.iterations, self.neighborhood_size if n >= 2 else 0)
+        if n < 2:
+            return np.empty(shape, np.intp), np.empty(shape, np.intp)
+        i = self.rng.integers(0, n, shape)
+        j = (i + self.rng.integers(1, n, shape)) % n
+        return i, j
+
+    def _evaluate_neighbors(self, perm, i, j, current_cost):
+        """Costs every candidate swap of perm, using O(1) deltas where the
+        swap leaves the route split unchanged"""
+        return swap_costs(perm, i, j, current_cost, self.cvrp.distance_matrix,
+                          self.cvrp.demands, self.cvrp.vehicle_capacity,
+                          self._candidate_costs[:len(i)])
+
+    @staticmethod
+    def _swap(perm, i, j):
+        perm[i], perm[j] = perm[j], perm[i]
+
+    def _make_tabu(self, move):
+        if move is None or self.tabu_size <= 0:
+            return
+        if len(self.tabu_deque) == self.tabu_deque.maxlen:
+            # The deque drops its oldest move on append
+            self.tabu_set.discard(self.tabu_deque[0])
+        self.tabu_deque.append(move)
+        self.tabu_set.add(move)
 
     def _split_to_routes(self, customers):
-        routes = []
-        current_route = [0]
-        current_load = 0
-        
-        for customer in customers:
-            demand = self.cvrp.demands[customer]
-            if current_load + demand > self.cvrp.vehicle_capacity:
-                current_route.append(0)
-                routes.append(current_route)
-                current_route = [0, customer]
-                current_load = demand
-            else:
-                current_route.append(customer)
-                current_load += demand
-        
-        if len(current_route) > 1:
-            current_route.append(0)
-            routes.append(current_route)
-        return routes
+        return split_to_routes(customers, self.cvrp.demands, self.cvrp.vehicle_capacity)
 
-    def _calculate_cost(self, solution):
-        return sum(self.cvrp.calculate_route_distance(route) for route in solution)
+    def _calculate_cost(self, perm):
+        return cost_of_perm(perm, self.cvrp.distance_matrix, self.cvrp.demands,
+                            self.cvrp.vehicle_capacity)
 
     def _update_stats(self, iteration, best_cost, current_cost):
-        self.stats['best'].append(best_cost)
-        self.stats['current'].append(current_cost)
-        self.stats['worst'].append(max(self.stats['best'] + [current_cost]))
+        self.stats['best'][iteration] = best_cost
+        self.stats['current'][iteration] = current_cost
+        self._worst_cost = max(self._worst_cost, best_cost, current_cost)
+        self.stats['worst'][iteration] = self._worst_cost
 
     def _prepare_results(self, best_solution, best_cost):
         return {
             'best_solution': best_solution,
             'best_distance': best_cost,
-            'average_distance': np.mean(self.stats['current']),
-            'worst_distance': max(self.stats['worst']),
-            'std_dev': np.std(self.stats['current']),
+            'average_distance': self.stats['current'].mean(),
+            'worst_distance': self.stats['worst'].max(),
+            'std_dev': self.stats['current'].std(),
             'stats': self.stats
         }
 
     @staticmethod
     def log_to_csv(results, instance_name, algorithm_name):
-        filename = f"results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        now = datetime.now()
+        filename = f"results_{now.strftime('%Y%m%d_%H%M%S')}.csv"
         with open(filename, 'a', newline='') as f:
             writer = csv.writer(f)
             writer.writerow([
@@ -128,5 +139,5 @@ class TabuSearch:
                 results['average_distance'],
                 results['worst_distance'],
                 results['std_dev'],
-                datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                now.strftime('%Y-%m-%d %H:%M:%S')
             ])
\ No newline at end of file
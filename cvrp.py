@@ -1,37 +1,78 @@
-import math
 from typing import List, Tuple, Dict
 import os
+from functools import lru_cache
+import numpy as np
+from kernels import route_distance, swap_delta
 
 class CVRP:
+    """Capacitated VRP instance with the depot at node index 0.
+
+    The distance matrix is kept in float32 to halve its cache footprint.
+    That is about 7 significant digits per edge, far below anything that
+    matters for route totals, and every sum over it is accumulated in
+    float64.
+
+    Instances declaring EDGE_WEIGHT_TYPE EUC_2D use the TSPLIB convention of
+    distances rounded to the nearest integer, stored as int32. All bundled
+    instances do, so the suite's objective (and every reported and logged
+    distance) is the rounded TSPLIB cost, not the exact Euclidean one.
+    """
     def __init__(self, depot: Tuple[float, float], locations: List[Tuple[float, float]], 
-                 demands: List[int], vehicle_capacity: int):
+                 demands: List[int], vehicle_capacity: int, distances: np.ndarray = None,
+                 edge_weight_type: str = None):
         self.depot = depot
-        self.locations = [depot] + locations  # depot is index 0
-        self.demands = [0] + demands  # depot has 0 demand
+        self.edge_weight_type = edge_weight_type
+        locations = np.asarray(locations, dtype=np.float64).reshape(-1, 2)
+        # Coordinates are stored as separate contiguous x/y arrays; depot is index 0
+        self.xs = np.concatenate(([depot[0]], locations[:, 0]))
+        self.ys = np.concatenate(([depot[1]], locations[:, 1]))
+        self.locations = np.stack([self.xs, self.ys], axis=1)  # (x, y) pairs
+        self.demands = np.concatenate(([0], demands)).astype(np.int32)  # depot has 0 demand
         self.vehicle_capacity = vehicle_capacity
-        self.distance_matrix = self._create_distance_matrix()
+        if distances is not None:
+            self.distance_matrix = np.ascontiguousarray(distances)
+        else:
+            self.distance_matrix = self._create_distance_matrix()
+        # Resolved once here; route lookups are hot enough that a per-call
+        # dtype check costs more than the kernel itself
+        self._integral = np.issubdtype(self.distance_matrix.dtype, np.integer)
         
-    def _create_distance_matrix(self) -> List[List[float]]:
+    def _create_distance_matrix(self) -> np.ndarray:
         """Create symmetric distance matrix between all locations"""
-        n = len(self.locations)
-        matrix = [[0.0] * n for _ in range(n)]
-        for i in range(n):
-            for j in range(i+1, n):
-                x1, y1 = self.locations[i]
-                x2, y2 = self.locations[j]
-                dist = math.sqrt((x2-x1)**2 + (y2-y1)**2)
-                matrix[i][j] = dist
-                matrix[j][i] = dist
-        return matrix
+        # |a-b|^2 = |a|^2 + |b|^2 - 2a.b turns the whole matrix into one GEMM
+        P = np.asarray(self.locations, dtype=np.float64)
+        d2 = np.sum(P * P, axis=1)
+        D2 = d2[:, None] + d2[None, :] - 2.0 * P @ P.T
+        np.maximum(D2, 0, out=D2)  # clip round-off below zero
+        np.fill_diagonal(D2, 0.0)
+        np.sqrt(D2, out=D2)
+        if self.edge_weight_type == 'EUC_2D':
+            return np.rint(D2).astype(np.int32)  # TSPLIB nint()
+        # Stored as float32 to halve the bytes moved by route evaluation;
+        # sums are still accumulated in float64
+        return D2.astype(np.float32)
 
     def calculate_route_distance(self, route: List[int]) -> float:
         """Calculate total distance for a given route"""
-        distance = 0.0
-        for i in range(len(route)-1):
-            from_node = route[i]
-            to_node = route[i+1]
-            distance += self.distance_matrix[from_node][to_node]
-        return distance
+        total = route_distance(np.asarray(route, dtype=np.int32), self.distance_matrix)
+        # Integer matrices sum exactly in float64, so the total is integral
+        if self._integral:
+            return int(total)
+        return total
+
+    def swap_delta(self, route: List[int], i: int, j: int) -> float:
+        """Change in route distance from swapping the nodes at positions i and j.
+
+        Both positions must be interior: the kernel reads each one's
+        neighbours without bounds checks.
+        """
+        route = np.asarray(route, dtype=np.int32)
+        if not (0 < i < len(route) - 1 and 0 < j < len(route) - 1):
+            raise ValueError("Swap positions must exclude the first and last node of the route")
+        delta = swap_delta(route, i, j, self.distance_matrix)
+        if self._integral:
+            return int(delta)
+        return delta
 
     def validate_solution(self, routes: List[List[int]]) -> bool:
         """Check if solution meets all constraints"""
@@ -49,7 +90,7 @@ class CVRP:
             
         # Check capacity constraints
         for route in routes:
-            route_demand = sum(self.demands[node] for node in route)
+            route_demand = self.demands[np.asarray(route, dtype=np.intp)].sum()
             if route_demand > self.vehicle_capacity:
                 return False
                 
@@ -61,17 +102,27 @@ class CVRP:
         return True
 
 def load_vrp_file(file_path: str) -> CVRP:
-    """Load standard VRP file format"""
+    """Load standard VRP file format.
+
+    Results are cached per absolute path and modification time, so every
+    algorithm run on an instance shares one parsed CVRP.
+    """
+    return _cached_load(os.path.abspath(file_path), os.path.getmtime(file_path))
+
+@lru_cache(maxsize=32)
+def _cached_load(file_path: str, mtime: float) -> CVRP:
+    return _parse_vrp_file(file_path)
+
+def _parse_vrp_file(file_path: str) -> CVRP:
     with open(file_path, 'r') as f:
-        lines = [line.strip() for line in f if line.strip()]
+        lines = [line for line in map(str.strip, f) if line]
     
     metadata = {}
-    node_coords = []
-    demands = []
+    sections = {}  # section name -> [first line, end line) in lines
     depot_index = 0
     
     section = None
-    for line in lines:
+    for i, line in enumerate(lines):
         if line.startswith('NODE_COORD_SECTION'):
             section = 'COORD'
             continue
@@ -84,34 +135,35 @@ def load_vrp_file(file_path: str) -> CVRP:
         elif line == 'EOF':
             break
             
-        if section == 'COORD':
-            parts = line.split()
-            if len(parts) >= 3:
-                node_coords.append((float(parts[1]), float(parts[2])))
-        elif section == 'DEMAND':
-            parts = line.split()
-            if len(parts) >= 2:
-                demands.append(int(parts[1]))
+        if section in ('COORD', 'DEMAND'):
+            # Only record the block's extent; it is parsed in bulk below
+            sections.setdefault(section, [i, i])[1] = i + 1
         elif section == 'DEPOT':
-            if line.strip() != '-1':
+            if line != '-1':
                 try:
-                    depot_index = int(line.strip()) - 1
+                    depot_index = int(line) - 1
                 except ValueError:
                     continue
         elif ':' in line:
             key, value = line.split(':', 1)
             metadata[key.strip()] = value.strip()
     
-    if not node_coords or not demands:
+    if 'COORD' not in sections or 'DEMAND' not in sections:
         raise ValueError("Invalid VRP file - missing coordinates or demands")
     
+    start, end = sections['COORD']
+    node_coords = np.loadtxt(lines[start:end], usecols=(1, 2), dtype=np.float64, ndmin=2)
+    start, end = sections['DEMAND']
+    demands = np.loadtxt(lines[start:end], usecols=1, dtype=np.int64, ndmin=1)
+    
     depot = node_coords[depot_index]
-    locations = [coord for i, coord in enumerate(node_coords) if i != depot_index]
-    demands = [demand for i, demand in enumerate(demands) if i != depot_index]
+    locations = np.delete(node_coords, depot_index, axis=0)
+    demands = np.delete(demands, depot_index)
     
     return CVRP(
         depot=depot,
         locations=locations,
         demands=demands,
-        vehicle_capacity=int(metadata.get('CAPACITY', 100))
+        vehicle_capacity=int(metadata.get('CAPACITY', 100)),
+        edge_weight_type=metadata.get('EDGE_WEIGHT_TYPE')
     )
\ No newline at end of file
@@ -0,0 +1,294 @@
+import math
+import numpy as np
+from numba import njit, prange
+from typing import List
+
+
+@njit(cache=True, nogil=True)
+def euclidean_distances(xs, ys, rounded, out):
+    """Fill out with the pairwise Euclidean distances of the points (xs, ys).
+
+    Each pair is computed once, on the upper triangle, and mirrored. With
+    rounded set, distances are rounded to the nearest integer as for
+    TSPLIB EUC_2D. out's dtype sets the stored precision; it is returned.
+    """
+    n = xs.shape[0]
+    for i in range(n):
+        out[i, i] = 0
+        for j in range(i + 1, n):
+            dx = xs[i] - xs[j]
+            dy = ys[i] - ys[j]
+            d = math.sqrt(dx * dx + dy * dy)
+            if rounded:
+                d = np.rint(d)
+            out[i, j] = d
+            out[j, i] = d
+    return out
+
+
+@njit(cache=True, nogil=True)
+def split_to_routes_nb(customers, demands, capacity):
+    """Split a customer permutation into capacity-feasible routes.
+
+    Returns a flat node buffer with the depot (0) written at both ends of
+    every route, plus the end offset of each route inside that buffer.
+    """
+    n = customers.shape[0]
+    flat = np.empty(3 * n + 2, np.int32)
+    route_ends = np.empty(n + 1, np.int32)
+    pos = 0
+    k = 0
+    load = 0
+    flat[pos] = 0
+    pos += 1
+    for idx in range(n):
+        c = customers[idx]
+        demand = demands[c]
+        if load + demand > capacity:
+            flat[pos] = 0
+            pos += 1
+            route_ends[k] = pos
+            k += 1
+            flat[pos] = 0
+            pos += 1
+            load = 0
+        flat[pos] = c
+        pos += 1
+        load += demand
+    start = route_ends[k - 1] if k > 0 else 0
+    if pos - start > 1:
+        flat[pos] = 0
+        pos += 1
+        route_ends[k] = pos
+        k += 1
+    return flat[:pos], route_ends[:k]
+
+
+@njit(cache=True, fastmath=True, nogil=True)
+def route_distance(route, D):
+    """Sum of D over consecutive node pairs of route.
+
+    Also valid for a flat buffer of back-to-back routes, since the
+    depot->depot edges between them cost 0.
+    """
+    total = 0.0
+    for t in range(route.shape[0] - 1):
+        total += D[route[t], route[t + 1]]
+    return total
+
+
+@njit(cache=True, nogil=True)
+def cost_of_perm(perm, D, demands, capacity):
+    """Total distance of the routes split_to_routes_nb would build from perm.
+
+    The capacity split and the distance sum are done in the same pass, so
+    no route structure is materialised.
+    """
+    total = 0.0
+    prev = 0
+    load = 0
+    for idx in range(perm.shape[0]):
+        c = perm[idx]
+        demand = demands[c]
+        if load + demand > capacity:
+            total += D[prev, 0]
+            prev = 0
+            load = 0
+        total += D[prev, c]
+        prev = c
+        load += demand
+    total += D[prev, 0]
+    return total
+
+
+@njit(cache=True, nogil=True)
+def swap_delta(route, i, j, D):
+    """Change in route distance from swapping the nodes at positions i and j.
+
+    Only the (at most four) edges touching the two positions are read, so
+    this is O(1). Neither position may be the first or last of route.
+    """
+    if i == j:
+        return 0.0
+    if i > j:
+        i, j = j, i
+    a = route[i]
+    b = route[j]
+    before_a = route[i - 1]
+    after_b = route[j + 1]
+    if j == i + 1:
+        # Adjacent: before_a -> a -> b -> after_b becomes before_a -> b -> a -> after_b
+        return (D[before_a, b] + D[b, a] + D[a, after_b]
+                - D[before_a, a] - D[a, b] - D[b, after_b])
+    after_a = route[i + 1]
+    before_b = route[j - 1]
+    return (D[before_a, b] + D[b, after_a] + D[before_b, a] + D[a, after_b]
+            - D[before_a, a] - D[a, after_a] - D[before_b, b] - D[b, after_b])
+
+
+@njit(cache=True, nogil=True)
+def swap_costs(perm, swaps_i, swaps_j, current_cost, D, demands, capacity, costs):
+    """Cost of perm after each candidate swap of positions swaps_i[k], swaps_j[k].
+
+    A swap leaves the capacity split unchanged when the two customers have
+    equal demand, or share a route and neither opens it (a new first
+    customer may fit in the previous route); those candidates are costed
+    with swap_delta in O(1). Any other swap can move route boundaries and
+    is costed in full. Candidates are evaluated serially; with most of them
+    O(1) this measured faster than costing every candidate in a prange.
+    Results are written into costs, which is returned.
+    """
+    n = perm.shape[0]
+    flat, route_ends = split_to_routes_nb(perm, demands, capacity)
+    # Route of each permutation position; route r's customers sit in flat
+    # after r + 1 leading depots and r trailing ones
+    route_of = np.empty(n, np.int32)
+    opens_route = np.zeros(n, np.bool_)
+    r = 0
+    load = 0
+    for p in range(n):
+        demand = demands[perm[p]]
+        if load + demand > capacity:
+            r += 1
+            load = 0
+            opens_route[p] = True
+        route_of[p] = r
+        load += demand
+    trial = perm.copy()
+    for k in range(swaps_i.shape[0]):
+        i = swaps_i[k]
+        j = swaps_j[k]
+        same_split = demands[perm[i]] == demands[perm[j]] or (
+            route_of[i] == route_of[j] and not opens_route[i] and not opens_route[j])
+        if same_split:
+            costs[k] = current_cost + swap_delta(
+                flat, i + 2 * route_of[i] + 1, j + 2 * route_of[j] + 1, D)
+        else:
+            trial[i] = perm[j]
+            trial[j] = perm[i]
+            costs[k] = cost_of_perm(trial, D, demands, capacity)
+            trial[i] = perm[i]
+            trial[j] = perm[j]
+    return costs
+
+
+@njit(cache=True, fastmath=True)
+def greedy_nb(D, demands, capacity, seed):
+    """Nearest-feasible-neighbour construction over the distance matrix.
+
+    Customers are scanned in a seeded random order so that ties between
+    equally distant candidates are broken differently on every run. The
+    result uses the same flat buffer + route end layout as
+    split_to_routes_nb, followed by a success flag; it is False, with
+    empty buffers, if some customer's demand exceeds the capacity.
+    """
+    np.random.seed(seed)
+    n = D.shape[0]
+    order = np.random.permutation(n - 1) + 1
+    visited = np.zeros(n, np.bool_)
+    flat = np.empty(3 * n, np.int32)
+    route_ends = np.empty(n, np.int32)
+    pos = 0
+    k = 0
+    flat[pos] = 0
+    pos += 1
+    last = 0
+    load = 0
+    remaining = n - 1
+    while remaining > 0:
+        best = -1
+        best_dist = 1e18
+        for idx in range(n - 1):
+            c = order[idx]
+            if not visited[c] and load + demands[c] <= capacity and D[last, c] < best_dist:
+                best_dist = D[last, c]
+                best = c
+        if best == -1:
+            if load == 0:
+                # No customer fits an empty vehicle
+                return flat[:0], route_ends[:0], False
+            # Return to depot and start a new route
+            flat[pos] = 0
+            pos += 1
+            route_ends[k] = pos
+            k += 1
+            flat[pos] = 0
+            pos += 1
+            last = 0
+            load = 0
+            continue
+        flat[pos] = best
+        pos += 1
+        visited[best] = True
+        load += demands[best]
+        last = best
+        remaining -= 1
+    start = route_ends[k - 1] if k > 0 else 0
+    if pos - start > 1:
+        flat[pos] = 0
+        pos += 1
+        route_ends[k] = pos
+        k += 1
+    return flat[:pos], route_ends[:k], True
+
+
+@njit(cache=True, parallel=True)
+def greedy_many_nb(D, demands, capacity, seeds):
+    """Run greedy_nb once per seed in parallel.
+
+    Run r's flat buffer and route ends are stored in row r of flats/ends,
+    with their used lengths in flat_lens/end_counts. status[r] is False if
+    run r failed, in which case its cost stays inf.
+    """
+    n = D.shape[0]
+    runs = seeds.shape[0]
+    costs = np.full(runs, np.inf)
+    status = np.zeros(runs, np.bool_)
+    flats = np.zeros((runs, 3 * n), np.int32)
+    flat_lens = np.empty(runs, np.int32)
+    ends = np.zeros((runs, n), np.int32)
+    end_counts = np.empty(runs, np.int32)
+    for r in prange(runs):
+        flat, route_ends, ok = greedy_nb(D, demands, capacity, seeds[r])
+        status[r] = ok
+        if not ok:
+            continue
+        costs[r] = route_distance(flat, D)
+        flats[r, :flat.shape[0]] = flat
+        flat_lens[r] = flat.shape[0]
+        ends[r, :route_ends.shape[0]] = route_ends
+        end_counts[r] = route_ends.shape[0]
+    return costs, flats, flat_lens, ends, end_counts, status
+
+
+@njit(cache=True, parallel=True)
+def random_many_nb(D, demands, capacity, seeds):
+    """Cost one seeded random customer permutation per seed, in parallel"""
+    n_customers = D.shape[0] - 1
+    n_iter = seeds.shape[0]
+    costs = np.empty(n_iter, np.float64)
+    perms = np.empty((n_iter, n_customers), np.int32)
+    for it in prange(n_iter):
+        np.random.seed(seeds[it])
+        perm = np.arange(1, n_customers + 1).astype(np.int32)
+        np.random.shuffle(perm)
+        perms[it] = perm
+        costs[it] = cost_of_perm(perm, D, demands, capacity)
+    return costs, perms
+
+
+def routes_from_flat(flat, route_ends) -> List[List[int]]:
+    """Rebuild a list of node lists from a flat route buffer"""
+    routes = []
+    start = 0
+    for end in route_ends:
+        routes.append(flat[start:end].tolist())
+        start = end
+    return routes
+
+
+def split_to_routes(customers, demands, capacity: int) -> List[List[int]]:
+    """Split customers into routes, returned as a list of node lists"""
+    flat, route_ends = split_to_routes_nb(
+        np.asarray(customers, dtype=np.int32), demands, capacity)
+    return routes_from_flat(flat, route_ends)
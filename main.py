@@ -4,9 +4,12 @@ from algorithms.random_algorithm import RandomAlgorithm
 from algorithms.greedy_algorithm import GreedyAlgorithm
 from algorithms.tabu_search import TabuSearch
 from algorithms.simulated_annealing import SimulatedAnnealing
+import numpy as np
+import numba
 import os
 import time
 import csv
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 
 def print_statistics(results: dict, instance: str, algorithm: str, exec_time: float):
@@ -22,25 +25,25 @@ def print_statistics(results: dict, instance: str, algorithm: str, exec_time: fl
     
     print("\n🚛 BEST SOLUTION ROUTES:")
     for i, route in enumerate(results['best_solution'], 1):
-        demand = sum(results['cvrp'].demands[node] for node in route)
+        demand = int(results['cvrp'].demands[np.asarray(route, dtype=np.intp)].sum())
         distance = results['cvrp'].calculate_route_distance(route)
         print(f"Route {i}: {' → '.join(map(str, route))}")
         print(f"   Demand: {demand}/{results['cvrp'].vehicle_capacity} | Distance: {distance:.2f}")
 
-def log_to_csv(results: dict, instance: str, algorithm: str):
-    """ CSV logging function"""
-    filename = f"cvrp_results_{datetime.now().strftime('%Y%m%d')}.csv"
-    file_exists = os.path.isfile(filename)
-    
-    with open(filename, 'a', newline='') as f:
-        writer = csv.writer(f)
-        if not file_exists:
-            writer.writerow([
-                'Timestamp', 'Instance', 'Algorithm',
-                'Best', 'Average', 'Worst', 'StdDev'
-            ])
-            
-        writer.writerow([
+# Results file date, fixed for the whole run
+_DATE_PREFIX = datetime.now().strftime('%Y%m%d')
+
+class CSVLogger:
+    """Buffers result rows in memory and appends them to the CSV in one write"""
+    HEADER = ['Timestamp', 'Instance', 'Algorithm', 'Best', 'Average', 'Worst', 'StdDev']
+
+    def __init__(self):
+        self.filename = f"cvrp_results_{_DATE_PREFIX}.csv"
+        self.write_header = not os.path.isfile(self.filename)
+        self.rows = []
+
+    def log(self, results: dict, instance: str, algorithm: str):
+        self.rows.append([
             datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
             instance,
             algorithm,
@@ -50,22 +53,50 @@ def log_to_csv(results: dict, instance: str, algorithm: str):
             f"{results['std_dev']:.2f}"
         ])
 
-def process_algorithm(cvrp_instance, instance_name, algorithm_class, config):
-    """Run an algorithm and handle results"""
+    def flush(self):
+        if not self.rows:
+            return
+        with open(self.filename, 'a', newline='') as f:
+            writer = csv.writer(f)
+            if self.write_header:
+                writer.writerow(self.HEADER)
+                self.write_header = False
+            writer.writerows(self.rows)
+        self.rows.clear()
+
+# Instance name -> CVRP for the whole sweep, set once per worker process so
+# distance matrices aren't pickled with every task
+_WORKER_PROBLEMS = {}
+
+def _init_worker(problems):
+    global _WORKER_PROBLEMS
+    _WORKER_PROBLEMS = problems
+    # The pool already runs one worker per core; parallel kernels inside
+    # each worker would otherwise start a thread per core as well
+    numba.set_num_threads(1)
+
+def process_algorithm(instance_name, algorithm_class, config):
+    """Run an algorithm in a worker process and return (results, exec_time)"""
     try:
-        start_time = time.time()
-        algorithm = algorithm_class(cvrp_instance, **config)
+        start_time = time.perf_counter_ns()  # monotonic, ns resolution
+        algorithm = algorithm_class(_WORKER_PROBLEMS[instance_name], **config)
         results = algorithm.run()
-        results['cvrp'] = cvrp_instance  # Add problem reference
-        exec_time = time.time() - start_time
-        
-        print_statistics(results, instance_name, algorithm_class.__name__, exec_time)
-        log_to_csv(results, instance_name, algorithm_class.__name__)
+        exec_time = (time.perf_counter_ns() - start_time) / 1e9
+        return results, exec_time
         
     except Exception as e:
-        print(f"\n❌ Error in {algorithm_class.__name__}: {str(e)}")
+        print(f"\n❌ Error in {algorithm_class.__name__} on {instance_name}: {str(e)}")
         return None
 
+def report_results(outcome, cvrp_instance, instance_name, algorithm_class, logger):
+    """Print and log a finished run; called in the parent so output isn't interleaved"""
+    if outcome is None:
+        return
+    results, exec_time = outcome
+    results['cvrp'] = cvrp_instance  # Add problem reference
+    print_statistics(results, instance_name, algorithm_class.__name__, exec_time)
+    logger.log(results, instance_name, algorithm_class.__name__)
+
 def main():
     print("=== CVRP SOLVER SUITE ===")
     print("Algorithms: GA, Random, Greedy, Tabu Search, Simulated Annealing\n")
@@ -104,7 +135,12 @@ def main():
         print(f"\n❌ Error: Create '{instance_folder}' folder with .vrp files!")
         return
 
-    # Process each instance
+    # Rows are buffered and written once when the sweep ends or is interrupted
+    logger = CSVLogger()
+
+    # Load every instance up front; results are reported later, in completion
+    # order, each under its own "<instance> - <ALGORITHM> RESULTS" header
+    problems = {}
     for instance in instances:
         file_path = os.path.join(instance_folder, instance)
         if not os.path.exists(file_path):
@@ -113,19 +149,37 @@ def main():
             
         try:
             print(f"\n{'#'*60}")
-            print(f"PROCESSING INSTANCE: {instance}")
+            print(f"LOADING INSTANCE: {instance}")
             print(f"{'#'*60}")
-            
-            # Load problem instance
-            problem = load_vrp_file(file_path)
-            
-            # Run all algorithms
-            for algorithm_class, config in algorithms.items():
-                process_algorithm(problem, instance, algorithm_class, config)
-                
+            problems[instance] = load_vrp_file(file_path)
         except Exception as e:
-            print(f"\n❌ Critical error processing {instance}: {str(e)}")
-            continue
+            print(f"\n❌ Critical error loading {instance}: {str(e)}")
+
+    # One pool runs the whole sweep as a flat queue of (instance, algorithm)
+    # tasks, reporting each as it finishes
+    try:
+        if problems:
+            with ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                     initializer=_init_worker, initargs=(problems,)) as executor:
+                futures = {
+                    executor.submit(process_algorithm, instance, algorithm_class, config): (instance, algorithm_class)
+                    for instance in problems
+                    for algorithm_class, config in algorithms.items()
+                }
+                try:
+                    for future in as_completed(futures):
+                        instance, algorithm_class = futures[future]
+                        try:
+                            report_results(future.result(), problems[instance], instance, algorithm_class, logger)
+                        except Exception as e:
+                            print(f"\n❌ Critical error processing {instance}: {str(e)}")
+                except BaseException:
+                    # Don't let shutdown run the rest of the queue on Ctrl-C
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise
+    finally:
+        # Finished results are written even if the sweep is interrupted
+        logger.flush()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,81 +1,98 @@
 # utils.py
-import math
+import numpy as np
 from cvrp import CVRP
+from kernels import euclidean_distances
+
+def _node_ids(id_column, n):
+    """0-based node ids of a data section, which must cover 0..n-1 once each"""
+    node_ids = np.asarray(id_column, dtype=np.intp) - 1
+    if not np.array_equal(np.sort(node_ids), np.arange(n)):
+        raise ValueError("Invalid VRP file - section node ids don't match DIMENSION")
+    return node_ids
 
 def read_vrp_file(file_path):
     """Reads standard VRP file format and returns CVRP instance"""
-    with open(file_path, 'r') as f:
-        lines = [line.strip() for line in f if line.strip()]
-
     data = {
-        'nodes': [],
-        'demands': [],
         'depot_index': 0
     }
+    xs = ys = demands = None
+    coord_lines, demand_lines = [], []
     current_section = None
     
-    for line in lines:
-        if line.startswith('NODE_COORD_SECTION'):
-            current_section = 'NODE_COORD'
-            continue
-        elif line.startswith('DEMAND_SECTION'):
-            current_section = 'DEMAND'
-            continue
-        elif line.startswith('DEPOT_SECTION'):
-            current_section = 'DEPOT'
-            continue
-        elif line == 'EOF':
-            break
+    # Single streaming pass: the data section lines are only collected
+    # here and converted in bulk by np.loadtxt afterwards, into arrays
+    # sized from the DIMENSION header, which precedes the data sections
+    with open(file_path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('NODE_COORD_SECTION'):
+                current_section = 'NODE_COORD'
+                continue
+            elif line.startswith('DEMAND_SECTION'):
+                current_section = 'DEMAND'
+                continue
+            elif line.startswith('DEPOT_SECTION'):
+                current_section = 'DEPOT'
+                continue
+            elif line == 'EOF':
+                break
 
-        if current_section == 'NODE_COORD':
-            parts = line.split()
-            node_id = int(parts[0]) - 1  # Convert to 0-based index
-            x = float(parts[1])
-            y = float(parts[2])
-            data['nodes'].append((node_id, x, y))
-        elif current_section == 'DEMAND':
-            parts = line.split()
-            node_id = int(parts[0]) - 1
-            demand = int(parts[1])
-            data['demands'].append((node_id, demand))
-        elif current_section == 'DEPOT':
-            if line.strip() != '-1':
-                data['depot_index'] = int(line.strip()) - 1
-        elif ':' in line:
-            key, value = line.split(':', 1)
-            key = key.strip().upper()
-            data[key] = value.strip()
+            if current_section in ('NODE_COORD', 'DEMAND') and xs is None:
+                raise ValueError("Invalid VRP file - DIMENSION must precede the data sections")
 
-    # Process nodes and demands
-    n = len(data['nodes'])
-    coords = [None] * n
-    demands = [0] * n
-    
-    for node_id, x, y in data['nodes']:
-        coords[node_id] = (x, y)
-    
-    for node_id, demand in data['demands']:
-        demands[node_id] = demand
+            if current_section == 'NODE_COORD':
+                coord_lines.append(line)
+            elif current_section == 'DEMAND':
+                demand_lines.append(line)
+            elif current_section == 'DEPOT':
+                if line != '-1':
+                    data['depot_index'] = int(line) - 1
+            elif ':' in line:
+                key, value = line.split(':', 1)
+                key = key.strip().upper()
+                data[key] = value.strip()
+                if key == 'DIMENSION':
+                    n = int(data[key])
+                    xs = np.empty(n, np.float64)
+                    ys = np.empty(n, np.float64)
+                    demands = np.zeros(n, np.int32)
 
-    # Create distance matrix
-    distances = [[0.0] * n for _ in range(n)]
-    for i in range(n):
-        for j in range(i + 1, n):
-            x1, y1 = coords[i]
-            x2, y2 = coords[j]
-            dist = math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-            distances[i][j] = dist
-            distances[j][i] = dist
+    if xs is None:
+        raise ValueError("Invalid VRP file - missing DIMENSION")
+    # Every node needs exactly one row, or its array slots would be left unset
+    if len(coord_lines) != len(xs) or len(demand_lines) != len(xs):
+        raise ValueError("Invalid VRP file - section sizes don't match DIMENSION")
+
+    # Rows are placed by node id (1-based in the file), not by line order
+    coords = np.loadtxt(coord_lines, dtype=np.float64, ndmin=2)
+    node_ids = _node_ids(coords[:, 0], len(xs))
+    xs[node_ids] = coords[:, 1]
+    ys[node_ids] = coords[:, 2]
+    node_demands = np.loadtxt(demand_lines, dtype=np.int64, ndmin=2)
+    demands[_node_ids(node_demands[:, 0], len(xs))] = node_demands[:, 1]
 
     # Separate depot and customers
-    depot = coords[data['depot_index']]
-    customer_coords = [coord for i, coord in enumerate(coords) if i != data['depot_index']]
-    customer_demands = [demand for i, demand in enumerate(demands) if i != data['depot_index']]
+    depot_index = data['depot_index']
+    customer_xs = np.delete(xs, depot_index)
+    customer_ys = np.delete(ys, depot_index)
+    customer_demands = np.delete(demands, depot_index)
+
+    # Create distance matrix, depot first to match CVRP's node indexing
+    node_xs = np.concatenate(([xs[depot_index]], customer_xs))
+    node_ys = np.concatenate(([ys[depot_index]], customer_ys))
+    # Only the upper triangle is computed, straight into the final matrix
+    euc_2d = data.get('EDGE_WEIGHT_TYPE') == 'EUC_2D'
+    n = len(node_xs)
+    distances = np.empty((n, n), dtype=np.int32 if euc_2d else np.float32)
+    euclidean_distances(node_xs, node_ys, euc_2d, distances)
 
     return CVRP(
-        depot=depot,
-        locations=customer_coords,
+        depot=(xs[depot_index], ys[depot_index]),
+        locations=np.column_stack((customer_xs, customer_ys)),
         demands=customer_demands,
         vehicle_capacity=int(data.get('CAPACITY', 100)),  
-        distances=distances
+        distances=distances,
+        edge_weight_type=data.get('EDGE_WEIGHT_TYPE')
     )
\ No newline at end of file